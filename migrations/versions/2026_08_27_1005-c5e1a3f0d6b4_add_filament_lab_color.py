@@ -0,0 +1,60 @@
+"""Add precomputed CIELAB color components to filament.
+
+Revision ID: c5e1a3f0d6b4
+Revises: b8881bdb716c
+Create Date: 2026-08-27 10:05:12.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from spoolman.math import hex_to_rgb, rgb_to_lab
+
+# revision identifiers, used by Alembic.
+revision = "c5e1a3f0d6b4"
+down_revision = "b8881bdb716c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Perform the upgrade."""
+    op.add_column(
+        "filament",
+        sa.Column("color_l", sa.Float(), nullable=True, comment="CIELAB L component of color_hex."),
+    )
+    op.add_column(
+        "filament",
+        sa.Column("color_a", sa.Float(), nullable=True, comment="CIELAB a component of color_hex."),
+    )
+    op.add_column(
+        "filament",
+        sa.Column("color_b", sa.Float(), nullable=True, comment="CIELAB b component of color_hex."),
+    )
+
+    # Backfill the Lab components for existing filaments with a color set
+    filament = sa.table(
+        "filament",
+        sa.column("id", sa.Integer),
+        sa.column("color_hex", sa.String),
+        sa.column("color_l", sa.Float),
+        sa.column("color_a", sa.Float),
+        sa.column("color_b", sa.Float),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(filament.c.id, filament.c.color_hex).where(filament.c.color_hex.is_not(None)),
+    ).all()
+    for filament_id, color_hex in rows:
+        lab = rgb_to_lab(hex_to_rgb(color_hex))
+        conn.execute(
+            sa.update(filament)
+            .where(filament.c.id == filament_id)
+            .values(color_l=lab[0], color_a=lab[1], color_b=lab[2]),
+        )
+
+
+def downgrade() -> None:
+    """Perform the downgrade."""
+    op.drop_column("filament", "color_b")
+    op.drop_column("filament", "color_a")
+    op.drop_column("filament", "color_l")
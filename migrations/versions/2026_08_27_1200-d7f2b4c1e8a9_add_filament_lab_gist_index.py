@@ -0,0 +1,34 @@
+"""Add a GiST cube index over the filament Lab columns on PostgreSQL.
+
+Revision ID: d7f2b4c1e8a9
+Revises: c5e1a3f0d6b4
+Create Date: 2026-08-27 12:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d7f2b4c1e8a9"
+down_revision = "c5e1a3f0d6b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Perform the upgrade."""
+    # The cube extension and GiST expression indexes only exist on PostgreSQL; color search on
+    # the other backends stays a sequential scan over the Lab columns.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute(
+        "CREATE INDEX filament_lab_idx ON filament "
+        "USING gist (cube(ARRAY[color_l, color_a, color_b])) "
+        "WHERE color_l IS NOT NULL",
+    )
+
+
+def downgrade() -> None:
+    """Perform the downgrade."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX filament_lab_idx")
@@ -1,35 +1,58 @@
 """Filament related endpoints."""
 
-import asyncio
 import logging
+from functools import lru_cache
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
-from fastapi.encoders import jsonable_encoder
-from fastapi.exceptions import RequestValidationError
+from fastapi import APIRouter, Depends, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, validator
-from pydantic.error_wrappers import ErrorWrapper
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from spoolman.api.v1.models import Filament, FilamentEvent, Message
+from spoolman.api.v1.models import Filament, FilamentEvent, Message, to_json_dict
+from spoolman.api.v1.parsing import invalid_query_error, resolve_id_filter, sort_query
+from spoolman.api.v1.responses import SpoolmanJSONResponse, stream_json_array
 from spoolman.database import filament
 from spoolman.database.database import get_db_session
 from spoolman.database.utils import SortOrder
 from spoolman.exceptions import ItemDeleteError
 from spoolman.extra_fields import EntityType, get_extra_fields, validate_extra_field_dict
-from spoolman.ws import websocket_manager
+from spoolman.ws import item_pool, websocket_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/filament",
     tags=["filament"],
+    default_response_class=SpoolmanJSONResponse,
 )
 
 # ruff: noqa: D103, B008
 
 
+_HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+
+@lru_cache(maxsize=256)
+def _normalize_color_hex(v: str) -> str:
+    """Normalize and validate a hex color code.
+
+    The same handful of color codes tends to repeat across requests, so the result is cached.
+    """
+    if v.startswith("#"):
+        v = v[1:]
+    v = v.upper()
+
+    if len(v) not in (6, 8):
+        raise ValueError("Color code must be 6 or 8 characters long.")
+
+    # Check per character; int(v, 16) would also accept signs, whitespace and underscores
+    if not all(c in _HEX_DIGITS for c in v):
+        raise ValueError("Invalid character in color code.")
+
+    return v
+
+
 class FilamentParameters(BaseModel):
     name: Optional[str] = Field(
         max_length=64,
@@ -93,18 +116,7 @@ class FilamentParameters(BaseModel):
         """Validate the color_hex field."""
         if not v:
             return None
-        if v.startswith("#"):
-            v = v[1:]
-        v = v.upper()
-
-        for c in v:
-            if c not in "0123456789ABCDEF":
-                raise ValueError("Invalid character in color code.")
-
-        if len(v) not in (6, 8):
-            raise ValueError("Color code must be 6 or 8 characters long.")
-
-        return v
+        return _normalize_color_hex(v)
 
 
 class FilamentUpdateParameters(FilamentParameters):
@@ -163,6 +175,15 @@ async def find(
         ),
         examples=["1", "1,2"],
     ),
+    vendor_id_typed: Optional[list[int]] = Query(
+        alias="vendor.id[]",
+        default=None,
+        title="Vendor IDs",
+        description=(
+            "Match an exact vendor ID. Repeat the parameter to match any of multiple IDs. "
+            "Specify -1 to match filaments with no vendor."
+        ),
+    ),
     name: Optional[str] = Query(
         default=None,
         title="Filament Name",
@@ -201,14 +222,7 @@ async def find(
         ),
         example=20.0,
     ),
-    sort: Optional[str] = Query(
-        default=None,
-        title="Sort",
-        description=(
-            'Sort the results by the given field. Should be a comma-separate string with "field:direction" items.'
-        ),
-        example="vendor.name:asc,spool_weight:desc",
-    ),
+    sort_by: Annotated[dict[str, SortOrder], Depends(sort_query)],
     limit: Optional[int] = Query(
         default=None,
         title="Limit",
@@ -219,51 +233,51 @@ async def find(
         title="Offset",
         description="Offset in the full result set if a limit is set.",
     ),
-) -> JSONResponse:
-    sort_by: dict[str, SortOrder] = {}
-    if sort is not None:
-        for sort_item in sort.split(","):
-            field, direction = sort_item.split(":")
-            sort_by[field] = SortOrder[direction.upper()]
-
-    vendor_id = vendor_id if vendor_id is not None else vendor_id_old
-    if vendor_id is not None:
-        try:
-            vendor_ids = [int(vendor_id_item) for vendor_id_item in vendor_id.split(",")]
-        except ValueError as e:
-            raise RequestValidationError([ErrorWrapper(ValueError("Invalid vendor_id"), ("query", "vendor_id"))]) from e
-    else:
-        vendor_ids = None
+) -> Response:
+    vendor_ids = resolve_id_filter(
+        vendor_id_typed,
+        vendor_id if vendor_id is not None else vendor_id_old,
+        "vendor_id",
+    )
 
     if color_hex is not None:
-        matched_filaments = await filament.find_by_color(
+        filter_by_ids = await filament.find_by_color(
             db=db,
             color_query_hex=color_hex,
             similarity_threshold=color_similarity_threshold,
         )
-        filter_by_ids = [db_filament.id for db_filament in matched_filaments]
     else:
         filter_by_ids = None
 
+    filters = {
+        "ids": filter_by_ids,
+        "vendor_name": vendor_name if vendor_name is not None else vendor_name_old,
+        "vendor_id": vendor_ids,
+        "name": name,
+        "material": material,
+        "article_number": article_number,
+    }
+
+    if limit is None:
+        # Unbounded result set, stream the items instead of materializing them all in memory
+        total_count = await filament.count(db=db, **filters)
+        items = await filament.find_iter(db=db, sort_by=sort_by, **filters)
+        return stream_json_array(
+            (to_json_dict(Filament.from_db(db_item)) async for db_item in items),
+            headers={"x-total-count": str(total_count)},
+        )
+
     db_items, total_count = await filament.find(
         db=db,
-        ids=filter_by_ids,
-        vendor_name=vendor_name if vendor_name is not None else vendor_name_old,
-        vendor_id=vendor_ids,
-        name=name,
-        material=material,
-        article_number=article_number,
         sort_by=sort_by,
         limit=limit,
         offset=offset,
+        **filters,
     )
 
     # Set x-total-count header for pagination
-    return JSONResponse(
-        content=jsonable_encoder(
-            (Filament.from_db(db_item) for db_item in db_items),
-            exclude_none=True,
-        ),
+    return SpoolmanJSONResponse(
+        content=[to_json_dict(Filament.from_db(db_item)) for db_item in db_items],
         headers={"x-total-count": str(total_count)},
     )
 
@@ -279,9 +293,8 @@ async def notify_any(
     websocket_manager.connect(("filament",), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect(("filament",), websocket)
 
@@ -294,14 +307,16 @@ async def notify_any(
         "See the HTTP Response code 299 for the content of the websocket messages."
     ),
     response_model_exclude_none=True,
+    response_model=Filament,
     responses={404: {"model": Message}, 299: {"model": FilamentEvent, "description": "Websocket message"}},
 )
 async def get(
     db: Annotated[AsyncSession, Depends(get_db_session)],
     filament_id: int,
-) -> Filament:
+) -> SpoolmanJSONResponse:
     db_item = await filament.get_by_id(db, filament_id)
-    return Filament.from_db(db_item)
+    # Serialize the item directly instead of going through the response_model validation, which is slow.
+    return SpoolmanJSONResponse(content=to_json_dict(Filament.from_db(db_item)))
 
 
 @router.websocket(
@@ -313,14 +328,13 @@ async def notify(
     filament_id: int,
 ) -> None:
     await websocket.accept()
-    websocket_manager.connect(("filament", str(filament_id)), websocket)
+    websocket_manager.connect(item_pool("filament", filament_id), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
-        websocket_manager.disconnect(("filament", str(filament_id)), websocket)
+        websocket_manager.disconnect(item_pool("filament", filament_id), websocket)
 
 
 @router.post(
@@ -360,7 +374,7 @@ async def create(  # noqa: ANN201
         extra=body.extra,
     )
 
-    return Filament.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Filament.from_db(db_item)))
 
 
 @router.patch(
@@ -382,12 +396,12 @@ async def update(  # noqa: ANN201
     filament_id: int,
     body: FilamentUpdateParameters,
 ):
-    patch_data = body.dict(exclude_unset=True)
+    patch_data = {k: getattr(body, k) for k in body.__fields_set__}
 
     if "density" in patch_data and body.density is None:
-        raise RequestValidationError([ErrorWrapper(ValueError("density cannot be unset"), ("query", "density"))])
+        raise invalid_query_error("density", "density cannot be unset")
     if "diameter" in patch_data and body.diameter is None:
-        raise RequestValidationError([ErrorWrapper(ValueError("diameter cannot be unset"), ("query", "diameter"))])
+        raise invalid_query_error("diameter", "diameter cannot be unset")
 
     if body.extra:
         all_fields = await get_extra_fields(db, EntityType.filament)
@@ -402,7 +416,7 @@ async def update(  # noqa: ANN201
         data=patch_data,
     )
 
-    return Filament.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Filament.from_db(db_item)))
 
 
 @router.delete(
@@ -1,7 +1,10 @@
 """Pydantic data models for typing the FastAPI request/responses."""
 
+from collections.abc import Callable
 from datetime import datetime, timezone
 from enum import Enum
+from functools import cache
+from operator import attrgetter
 from typing import Literal, Optional
 
 from pydantic import BaseModel as PydanticBaseModel
@@ -28,6 +31,32 @@ class BaseModel(PydanticBaseModel):
         }
 
 
+@cache
+def _model_fields(model_type: type[PydanticBaseModel]) -> tuple[tuple[str, ...], Callable[..., tuple]]:
+    """Get the field names of a model type and a compiled getter for them."""
+    names = tuple(model_type.__fields__)
+    if len(names) == 1:
+        # attrgetter returns a bare value for a single name, keep the tuple shape
+        return names, lambda model: (getattr(model, names[0]),)
+    return names, attrgetter(*names)
+
+
+def to_json_dict(model: PydanticBaseModel, *, exclude_none: bool = True) -> dict:
+    """Convert a model instance to a plain dict, ready for JSON serialization.
+
+    Does the same as .dict(exclude_none=True) for these models, but reads the attributes with a
+    precompiled attrgetter instead of going through Pydantic's export machinery, which is much
+    faster on the hot list-serialization paths.
+    """
+    names, getter = _model_fields(type(model))
+    result = {}
+    for name, value in zip(names, getter(model)):
+        if value is None and exclude_none:
+            continue
+        result[name] = to_json_dict(value, exclude_none=exclude_none) if isinstance(value, PydanticBaseModel) else value
+    return result
+
+
 class Message(BaseModel):
     message: str = Field()
 
@@ -70,7 +99,9 @@ class Vendor(BaseModel):
     @staticmethod
     def from_db(item: models.Vendor) -> "Vendor":
         """Create a new Pydantic vendor object from a database vendor object."""
-        return Vendor(
+        # construct() skips validation, which is safe here since the values come straight
+        # from the database and is significantly faster on large list responses
+        return Vendor.construct(
             id=item.id,
             registered=item.registered,
             name=item.name,
@@ -145,7 +176,8 @@ class Filament(BaseModel):
     @staticmethod
     def from_db(item: models.Filament) -> "Filament":
         """Create a new Pydantic filament object from a database filament object."""
-        return Filament(
+        # construct() skips validation of the database-sourced values, see Vendor.from_db
+        return Filament.construct(
             id=item.id,
             registered=item.registered,
             name=item.name,
@@ -240,7 +272,8 @@ class Spool(BaseModel):
             diameter=filament.diameter,
         )
 
-        return Spool(
+        # construct() skips validation of the database-sourced values, see Vendor.from_db
+        return Spool.construct(
             id=item.id,
             registered=item.registered,
             first_used=item.first_used,
@@ -0,0 +1,74 @@
+"""Helpers for parsing common query parameters."""
+
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Query
+from fastapi.exceptions import RequestValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+from spoolman.database.utils import SortOrder
+
+
+def invalid_query_error(field: str, message: str) -> RequestValidationError:
+    """Build a RequestValidationError for a single invalid query parameter."""
+    return RequestValidationError([ErrorWrapper(ValueError(message), ("query", field))])
+
+
+@lru_cache(maxsize=1024)
+def parse_sort(sort: str) -> tuple[tuple[str, SortOrder], ...]:
+    """Parse a comma-separated list of "field:direction" sort items.
+
+    Clients tend to reuse a small set of sort strings, so the parse result is cached.
+    """
+    parsed = []
+    for sort_item in sort.split(","):
+        field, direction = sort_item.split(":")
+        parsed.append((field, SortOrder[direction.upper()]))
+    return tuple(parsed)
+
+
+def sort_query(
+    sort: Optional[str] = Query(
+        default=None,
+        title="Sort",
+        description=(
+            'Sort the results by the given field. Should be a comma-separate string with "field:direction" items.'
+        ),
+        example="name:asc,id:desc",
+    ),
+) -> dict[str, SortOrder]:
+    """FastAPI dependency that parses the sort query parameter into a field-to-order dict."""
+    if not sort:
+        return {}
+    return dict(parse_sort(sort))
+
+
+@lru_cache(maxsize=1024)
+def parse_id_csv(ids: str) -> tuple[int, ...]:
+    """Parse a comma-separated list of IDs.
+
+    Raises ValueError if any item is not a valid integer.
+    """
+    return tuple(int(id_item) for id_item in ids.split(","))
+
+
+def resolve_id_filter(
+    typed: Optional[list[int]],
+    csv: Optional[str],
+    field: str,
+) -> Optional[Sequence[int]]:
+    """Resolve an ID filter given as typed repeated parameters or a comma-separated string.
+
+    The typed form takes precedence. Raises RequestValidationError if the string form cannot
+    be parsed.
+    """
+    if typed is not None:
+        return typed
+    if csv is None:
+        return None
+    try:
+        return parse_id_csv(csv)
+    except ValueError as e:
+        raise invalid_query_error(field, f"Invalid {field}") from e
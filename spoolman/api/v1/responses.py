@@ -0,0 +1,42 @@
+"""Custom FastAPI response classes."""
+
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+"""Naive datetimes are treated as UTC and serialized with a "Z" suffix, matching the format
+produced by the Pydantic models in models.py."""
+
+
+class SpoolmanJSONResponse(ORJSONResponse):
+    """JSON response rendered by orjson.
+
+    Naive datetimes are treated as UTC and serialized with a "Z" suffix, matching the format
+    produced by the Pydantic models in models.py.
+    """
+
+    def render(self, content: Any) -> bytes:  # noqa: ANN401
+        """Render the content as JSON."""
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def stream_json_array(items: AsyncIterable[Any], headers: Optional[dict[str, str]] = None) -> StreamingResponse:
+    """Build a streaming response that renders an async iterable of objects as a JSON array.
+
+    Each object is rendered by orjson as it arrives, so the full result set never has to be
+    held in memory at once.
+    """
+
+    async def render() -> AsyncIterator[bytes]:
+        yield b"["
+        first = True
+        async for item in items:
+            prefix = b"" if first else b","
+            first = False
+            yield prefix + orjson.dumps(item, option=ORJSON_OPTIONS)
+        yield b"]"
+
+    return StreamingResponse(render(), media_type="application/json", headers=headers)
@@ -2,7 +2,6 @@
 
 # ruff: noqa: D103
 
-import asyncio
 import logging
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
@@ -96,9 +95,8 @@ async def notify(
     websocket_manager.connect((), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect((), websocket)
 
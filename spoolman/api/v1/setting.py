@@ -1,6 +1,5 @@
 """Vendor related endpoints."""
 
-import asyncio
 import logging
 from typing import Annotated, Union
 
@@ -36,9 +35,8 @@ async def notify_any(
     websocket_manager.connect(("setting",), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect(("setting",), websocket)
 
@@ -135,9 +133,8 @@ async def notify(
     websocket_manager.connect(("setting", str(key)), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect(("setting", str(key)), websocket)
 
@@ -1,31 +1,30 @@
 """Spool related endpoints."""
 
-import asyncio
 import logging
 from datetime import datetime
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
-from fastapi.encoders import jsonable_encoder
-from fastapi.exceptions import RequestValidationError
+from fastapi import APIRouter, Depends, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from pydantic.error_wrappers import ErrorWrapper
+from pydantic import BaseModel, Field, root_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from spoolman.api.v1.models import Message, Spool, SpoolEvent
+from spoolman.api.v1.models import Message, Spool, SpoolEvent, to_json_dict
+from spoolman.api.v1.parsing import invalid_query_error, resolve_id_filter, sort_query
+from spoolman.api.v1.responses import SpoolmanJSONResponse, stream_json_array
 from spoolman.database import spool
 from spoolman.database.database import get_db_session
 from spoolman.database.utils import SortOrder
 from spoolman.exceptions import ItemCreateError
 from spoolman.extra_fields import EntityType, get_extra_fields, validate_extra_field_dict
-from spoolman.ws import websocket_manager
+from spoolman.ws import item_pool, websocket_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/spool",
     tags=["spool"],
+    default_response_class=SpoolmanJSONResponse,
 )
 
 # ruff: noqa: D103,B008
@@ -65,6 +64,13 @@ class SpoolParameters(BaseModel):
         description="Extra fields for this spool.",
     )
 
+    @root_validator
+    def validate_weights(cls, values: dict) -> dict:  # noqa: N805
+        """Ensure that only one of remaining_weight and used_weight is specified."""
+        if values.get("remaining_weight") is not None and values.get("used_weight") is not None:
+            raise ValueError("Only specify either remaining_weight or used_weight.")
+        return values
+
 
 class SpoolUpdateParameters(SpoolParameters):
     filament_id: Optional[int] = Field(description="The ID of the filament type of this spool.")
@@ -144,6 +150,12 @@ async def find(
         description="Match an exact filament ID. Separate multiple IDs with a comma.",
         examples=["1", "1,2"],
     ),
+    filament_id_typed: Optional[list[int]] = Query(
+        alias="filament.id[]",
+        default=None,
+        title="Filament IDs",
+        description="Match an exact filament ID. Repeat the parameter to match any of multiple IDs.",
+    ),
     filament_material: Optional[str] = Query(
         alias="filament.material",
         default=None,
@@ -172,6 +184,15 @@ async def find(
         ),
         examples=["1", "1,2"],
     ),
+    filament_vendor_id_typed: Optional[list[int]] = Query(
+        alias="filament.vendor.id[]",
+        default=None,
+        title="Vendor IDs",
+        description=(
+            "Match an exact vendor ID. Repeat the parameter to match any of multiple IDs. "
+            "Set it to -1 to match spools with filaments with no vendor."
+        ),
+    ),
     location: Optional[str] = Query(
         default=None,
         title="Location",
@@ -193,14 +214,7 @@ async def find(
         title="Allow Archived",
         description="Whether to include archived spools in the search results.",
     ),
-    sort: Optional[str] = Query(
-        default=None,
-        title="Sort",
-        description=(
-            'Sort the results by the given field. Should be a comma-separate string with "field:direction" items.'
-        ),
-        example="filament.name:asc,filament.vendor.id:asc,location:desc",
-    ),
+    sort_by: Annotated[dict[str, SortOrder], Depends(sort_query)],
     limit: Optional[int] = Query(
         default=None,
         title="Limit",
@@ -211,54 +225,49 @@ async def find(
         title="Offset",
         description="Offset in the full result set if a limit is set.",
     ),
-) -> JSONResponse:
-    sort_by: dict[str, SortOrder] = {}
-    if sort is not None:
-        for sort_item in sort.split(","):
-            field, direction = sort_item.split(":")
-            sort_by[field] = SortOrder[direction.upper()]
-
-    filament_id = filament_id if filament_id is not None else filament_id_old
-    if filament_id is not None:
-        try:
-            filament_ids = [int(filament_id_item) for filament_id_item in filament_id.split(",")]
-        except ValueError as e:
-            raise RequestValidationError(
-                [ErrorWrapper(ValueError("Invalid filament_id"), ("query", "filament_id"))],
-            ) from e
-    else:
-        filament_ids = None
-
-    filament_vendor_id = filament_vendor_id if filament_vendor_id is not None else vendor_id_old
-    if filament_vendor_id is not None:
-        try:
-            filament_vendor_ids = [int(vendor_id_item) for vendor_id_item in filament_vendor_id.split(",")]
-        except ValueError as e:
-            raise RequestValidationError([ErrorWrapper(ValueError("Invalid vendor_id"), ("query", "vendor_id"))]) from e
-    else:
-        filament_vendor_ids = None
+) -> Response:
+    filament_ids = resolve_id_filter(
+        filament_id_typed,
+        filament_id if filament_id is not None else filament_id_old,
+        "filament_id",
+    )
+    filament_vendor_ids = resolve_id_filter(
+        filament_vendor_id_typed,
+        filament_vendor_id if filament_vendor_id is not None else vendor_id_old,
+        "vendor_id",
+    )
+
+    filters = {
+        "filament_name": filament_name if filament_name is not None else filament_name_old,
+        "filament_id": filament_ids,
+        "filament_material": filament_material if filament_material is not None else filament_material_old,
+        "vendor_name": filament_vendor_name if filament_vendor_name is not None else vendor_name_old,
+        "vendor_id": filament_vendor_ids,
+        "location": location,
+        "lot_nr": lot_nr,
+        "allow_archived": allow_archived,
+    }
+
+    if limit is None:
+        # Unbounded result set, stream the items instead of materializing them all in memory
+        total_count = await spool.count(db=db, **filters)
+        items = await spool.find_iter(db=db, sort_by=sort_by, **filters)
+        return stream_json_array(
+            (to_json_dict(Spool.from_db(db_item)) async for db_item in items),
+            headers={"x-total-count": str(total_count)},
+        )
 
     db_items, total_count = await spool.find(
         db=db,
-        filament_name=filament_name if filament_name is not None else filament_name_old,
-        filament_id=filament_ids,
-        filament_material=filament_material if filament_material is not None else filament_material_old,
-        vendor_name=filament_vendor_name if filament_vendor_name is not None else vendor_name_old,
-        vendor_id=filament_vendor_ids,
-        location=location,
-        lot_nr=lot_nr,
-        allow_archived=allow_archived,
         sort_by=sort_by,
         limit=limit,
         offset=offset,
+        **filters,
     )
 
     # Set x-total-count header for pagination
-    return JSONResponse(
-        content=jsonable_encoder(
-            (Spool.from_db(db_item) for db_item in db_items),
-            exclude_none=True,
-        ),
+    return SpoolmanJSONResponse(
+        content=[to_json_dict(Spool.from_db(db_item)) for db_item in db_items],
         headers={"x-total-count": str(total_count)},
     )
 
@@ -274,9 +283,8 @@ async def notify_any(
     websocket_manager.connect(("spool",), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect(("spool",), websocket)
 
@@ -289,14 +297,16 @@ async def notify_any(
         "See the HTTP Response code 299 for the content of the websocket messages."
     ),
     response_model_exclude_none=True,
+    response_model=Spool,
     responses={404: {"model": Message}, 299: {"model": SpoolEvent, "description": "Websocket message"}},
 )
 async def get(
     db: Annotated[AsyncSession, Depends(get_db_session)],
     spool_id: int,
-) -> Spool:
+) -> SpoolmanJSONResponse:
     db_item = await spool.get_by_id(db, spool_id)
-    return Spool.from_db(db_item)
+    # Serialize the item directly instead of going through the response_model validation, which is slow.
+    return SpoolmanJSONResponse(content=to_json_dict(Spool.from_db(db_item)))
 
 
 @router.websocket(
@@ -308,14 +318,13 @@ async def notify(
     spool_id: int,
 ) -> None:
     await websocket.accept()
-    websocket_manager.connect(("spool", str(spool_id)), websocket)
+    websocket_manager.connect(item_pool("spool", spool_id), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
-        websocket_manager.disconnect(("spool", str(spool_id)), websocket)
+        websocket_manager.disconnect(item_pool("spool", spool_id), websocket)
 
 
 @router.post(
@@ -336,12 +345,6 @@ async def create(  # noqa: ANN201
     db: Annotated[AsyncSession, Depends(get_db_session)],
     body: SpoolParameters,
 ):
-    if body.remaining_weight is not None and body.used_weight is not None:
-        return JSONResponse(
-            status_code=400,
-            content={"message": "Only specify either remaining_weight or used_weight."},
-        )
-
     if body.extra:
         all_fields = await get_extra_fields(db, EntityType.spool)
         try:
@@ -364,7 +367,7 @@ async def create(  # noqa: ANN201
             archived=body.archived,
             extra=body.extra,
         )
-        return Spool.from_db(db_item)
+        return SpoolmanJSONResponse(content=to_json_dict(Spool.from_db(db_item)))
     except ItemCreateError:
         logger.exception("Failed to create spool.")
         return JSONResponse(
@@ -394,13 +397,7 @@ async def update(  # noqa: ANN201
     spool_id: int,
     body: SpoolUpdateParameters,
 ):
-    patch_data = body.dict(exclude_unset=True)
-
-    if body.remaining_weight is not None and body.used_weight is not None:
-        return JSONResponse(
-            status_code=400,
-            content={"message": "Only specify either remaining_weight or used_weight."},
-        )
+    patch_data = {k: getattr(body, k) for k in body.__fields_set__}
 
     if body.extra:
         all_fields = await get_extra_fields(db, EntityType.spool)
@@ -410,9 +407,7 @@ async def update(  # noqa: ANN201
             return JSONResponse(status_code=400, content=Message(message=str(e)).dict())
 
     if "filament_id" in patch_data and body.filament_id is None:
-        raise RequestValidationError(
-            [ErrorWrapper(ValueError("filament_id cannot be unset"), ("query", "filament_id"))],
-        )
+        raise invalid_query_error("filament_id", "filament_id cannot be unset")
 
     try:
         db_item = await spool.update(
@@ -427,7 +422,7 @@ async def update(  # noqa: ANN201
             content={"message": "Failed to update spool, see server logs for more information."},
         )
 
-    return Spool.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Spool.from_db(db_item)))
 
 
 @router.delete(
@@ -470,11 +465,11 @@ async def use(  # noqa: ANN201
 
     if body.use_weight is not None:
         db_item = await spool.use_weight(db, spool_id, body.use_weight)
-        return Spool.from_db(db_item)
+        return SpoolmanJSONResponse(content=to_json_dict(Spool.from_db(db_item)))
 
     if body.use_length is not None:
         db_item = await spool.use_length(db, spool_id, body.use_length)
-        return Spool.from_db(db_item)
+        return SpoolmanJSONResponse(content=to_json_dict(Spool.from_db(db_item)))
 
     return JSONResponse(
         status_code=400,
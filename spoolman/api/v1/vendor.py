@@ -1,26 +1,25 @@
 """Vendor related endpoints."""
 
-import asyncio
 from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
-from fastapi.encoders import jsonable_encoder
-from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from pydantic.error_wrappers import ErrorWrapper
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from spoolman.api.v1.models import Message, Vendor, VendorEvent
+from spoolman.api.v1.models import Message, Vendor, VendorEvent, to_json_dict
+from spoolman.api.v1.parsing import invalid_query_error, sort_query
+from spoolman.api.v1.responses import SpoolmanJSONResponse
 from spoolman.database import vendor
 from spoolman.database.database import get_db_session
 from spoolman.database.utils import SortOrder
 from spoolman.extra_fields import EntityType, get_extra_fields, validate_extra_field_dict
-from spoolman.ws import websocket_manager
+from spoolman.ws import item_pool, websocket_manager
 
 router = APIRouter(
     prefix="/vendor",
     tags=["vendor"],
+    default_response_class=SpoolmanJSONResponse,
 )
 
 # ruff: noqa: D103,B008
@@ -65,19 +64,12 @@ class VendorUpdateParameters(VendorParameters):
 )
 async def find(
     db: Annotated[AsyncSession, Depends(get_db_session)],
+    sort_by: Annotated[dict[str, SortOrder], Depends(sort_query)],
     name: Optional[str] = Query(
         default=None,
         title="Vendor Name",
         description="Partial case-insensitive search term for the vendor name. Separate multiple terms with a comma.",
     ),
-    sort: Optional[str] = Query(
-        default=None,
-        title="Sort",
-        description=(
-            'Sort the results by the given field. Should be a comma-separate string with "field:direction" items.'
-        ),
-        example="name:asc,id:desc",
-    ),
     limit: Optional[int] = Query(
         default=None,
         title="Limit",
@@ -88,13 +80,7 @@ async def find(
         title="Offset",
         description="Offset in the full result set if a limit is set.",
     ),
-) -> JSONResponse:
-    sort_by: dict[str, SortOrder] = {}
-    if sort is not None:
-        for sort_item in sort.split(","):
-            field, direction = sort_item.split(":")
-            sort_by[field] = SortOrder[direction.upper()]
-
+) -> SpoolmanJSONResponse:
     db_items, total_count = await vendor.find(
         db=db,
         name=name,
@@ -103,11 +89,8 @@ async def find(
         offset=offset,
     )
     # Set x-total-count header for pagination
-    return JSONResponse(
-        content=jsonable_encoder(
-            (Vendor.from_db(db_item) for db_item in db_items),
-            exclude_none=True,
-        ),
+    return SpoolmanJSONResponse(
+        content=[to_json_dict(Vendor.from_db(db_item)) for db_item in db_items],
         headers={"x-total-count": str(total_count)},
     )
 
@@ -123,9 +106,8 @@ async def notify_any(
     websocket_manager.connect(("vendor",), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
         websocket_manager.disconnect(("vendor",), websocket)
 
@@ -138,14 +120,15 @@ async def notify_any(
         "See the HTTP Response code 299 for the content of the websocket messages."
     ),
     response_model_exclude_none=True,
+    response_model=Vendor,
     responses={404: {"model": Message}, 299: {"model": VendorEvent, "description": "Websocket message"}},
 )
 async def get(
     db: Annotated[AsyncSession, Depends(get_db_session)],
     vendor_id: int,
-) -> Vendor:
+) -> SpoolmanJSONResponse:
     db_item = await vendor.get_by_id(db, vendor_id)
-    return Vendor.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Vendor.from_db(db_item)))
 
 
 @router.websocket(
@@ -157,14 +140,13 @@ async def notify(
     vendor_id: int,
 ) -> None:
     await websocket.accept()
-    websocket_manager.connect(("vendor", str(vendor_id)), websocket)
+    websocket_manager.connect(item_pool("vendor", vendor_id), websocket)
     try:
         while True:
-            await asyncio.sleep(0.5)
-            if await websocket.receive_text():
-                await websocket.send_json({"status": "healthy"})
+            await websocket.receive_text()
+            await websocket.send_json({"status": "healthy"})
     except WebSocketDisconnect:
-        websocket_manager.disconnect(("vendor", str(vendor_id)), websocket)
+        websocket_manager.disconnect(item_pool("vendor", vendor_id), websocket)
 
 
 @router.post(
@@ -193,7 +175,7 @@ async def create(  # noqa: ANN201
         extra=body.extra,
     )
 
-    return Vendor.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Vendor.from_db(db_item)))
 
 
 @router.patch(
@@ -215,10 +197,10 @@ async def update(  # noqa: ANN201
     vendor_id: int,
     body: VendorUpdateParameters,
 ):
-    patch_data = body.dict(exclude_unset=True)
+    patch_data = {k: getattr(body, k) for k in body.__fields_set__}
 
     if "name" in patch_data and body.name is None:
-        raise RequestValidationError([ErrorWrapper(ValueError("name cannot be unset"), ("query", "name"))])
+        raise invalid_query_error("name", "name cannot be unset")
 
     if body.extra:
         all_fields = await get_extra_fields(db, EntityType.vendor)
@@ -233,7 +215,7 @@ async def update(  # noqa: ANN201
         data=patch_data,
     )
 
-    return Vendor.from_db(db_item)
+    return SpoolmanJSONResponse(content=to_json_dict(Vendor.from_db(db_item)))
 
 
 @router.delete(
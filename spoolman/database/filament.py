@@ -1,29 +1,49 @@
 """Helper functions for interacting with filament database objects."""
 
 import logging
-from collections.abc import Sequence
-from datetime import datetime
+import math
+from collections.abc import AsyncIterator, Sequence
+from functools import lru_cache
 from typing import Optional, Union
 
 import sqlalchemy
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import array as pg_array
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from spoolman.api.v1.models import EventType, Filament, FilamentEvent
 from spoolman.database import models, vendor
 from spoolman.database.utils import (
     SortOrder,
-    add_where_clause_int_in,
-    add_where_clause_int_opt,
-    add_where_clause_str,
-    add_where_clause_str_opt,
-    parse_nested_field,
+    iter_async,
+    utc_now,
+    where_clause_int_in,
+    where_clause_int_opt,
+    where_clause_str,
+    where_clause_str_opt,
 )
 from spoolman.exceptions import ItemDeleteError, ItemNotFoundError
-from spoolman.math import delta_e, hex_to_rgb, rgb_to_lab
-from spoolman.ws import websocket_manager
+from spoolman.math import hex_to_rgb, rgb_to_lab
+from spoolman.ws import item_pool, websocket_manager
+
+
+@lru_cache(maxsize=4096)
+def _hex_to_lab(color_hex: str) -> tuple[float, float, float]:
+    """Convert a hex color to its CIELAB components.
+
+    Pure conversion, cached since filaments tend to share a small set of colors.
+    """
+    lab = rgb_to_lab(hex_to_rgb(color_hex))
+    return (lab[0], lab[1], lab[2])
+
+
+def _lab_components(color_hex: Optional[str]) -> tuple[Optional[float], Optional[float], Optional[float]]:
+    """Compute the CIELAB components for a hex color, or Nones if no color is set."""
+    if color_hex is None:
+        return (None, None, None)
+    return _hex_to_lab(color_hex)
 
 
 async def create(
@@ -49,9 +69,10 @@ async def create(
     if vendor_id is not None:
         vendor_item = await vendor.get_by_id(db, vendor_id)
 
+    color_l, color_a, color_b = _lab_components(color_hex)
     filament = models.Filament(
         name=name,
-        registered=datetime.utcnow().replace(microsecond=0),
+        registered=utc_now().replace(microsecond=0),
         vendor=vendor_item,
         material=material,
         price=price,
@@ -64,6 +85,9 @@ async def create(
         settings_extruder_temp=settings_extruder_temp,
         settings_bed_temp=settings_bed_temp,
         color_hex=color_hex,
+        color_l=color_l,
+        color_a=color_a,
+        color_b=color_b,
         extra=[models.FilamentField(key=k, value=v) for k, v in (extra or {}).items()],
     )
     db.add(filament)
@@ -72,18 +96,99 @@ async def create(
     return filament
 
 
+# Prepared once at module scope so the loader-option tree and the compiled SQL are reused
+# from the statement cache on every call.
+# Load the nested objects as well, with a static option tree instead of joinedload("*"):
+# joined loads for the to-one chain, selectin loads for the extra-field collections.
+_GET_BY_ID_STMT = (
+    select(models.Filament)
+    .where(models.Filament.id == sqlalchemy.bindparam("filament_id"))
+    .options(
+        joinedload(models.Filament.vendor),
+        selectinload(models.Filament.extra),
+        joinedload(models.Filament.vendor).selectinload(models.Vendor.extra),
+    )
+)
+
+
+# Variant that re-reads the row even if the instance is already in the identity map, for use
+# after Core UPDATE statements that bypass session synchronization
+_GET_BY_ID_REFRESH_STMT = _GET_BY_ID_STMT.execution_options(populate_existing=True)
+
+
 async def get_by_id(db: AsyncSession, filament_id: int) -> models.Filament:
     """Get a filament object from the database by the unique ID."""
-    filament = await db.get(
-        models.Filament,
-        filament_id,
-        options=[joinedload("*")],  # Load all nested objects as well
-    )
+    result = await db.execute(_GET_BY_ID_STMT, {"filament_id": filament_id})
+    filament = result.unique().scalar_one_or_none()
     if filament is None:
         raise ItemNotFoundError(f"No filament with ID {filament_id} found.")
     return filament
 
 
+# Shared base for the find statements, hoisted so each call starts from the same pre-built
+# (and statement-cache-friendly) structure instead of reconstructing it
+_FIND_BASE_STMT = (
+    select(models.Filament)
+    .options(contains_eager(models.Filament.vendor))
+    .join(models.Filament.vendor, isouter=True)
+)
+
+
+# Allowlisted sort fields, precomputed so sorting is a dict lookup instead of a reflective
+# attribute walk per request. Nested vendor fields use the joined table.
+_SORT_FIELDS: dict[str, sqlalchemy.ColumnElement] = {
+    **{
+        attr.key: getattr(models.Filament, attr.key)
+        for attr in sqlalchemy.inspect(models.Filament).mapper.column_attrs
+    },
+    **{
+        f"vendor.{attr.key}": getattr(models.Vendor, attr.key)
+        for attr in sqlalchemy.inspect(models.Vendor).mapper.column_attrs
+    },
+}
+
+
+def _find_stmt(
+    *,
+    ids: Optional[list[int]] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    name: Optional[str] = None,
+    material: Optional[str] = None,
+    article_number: Optional[str] = None,
+    sort_by: Optional[dict[str, SortOrder]] = None,
+) -> sqlalchemy.Select:
+    """Build a select statement for filament objects matching the search criteria."""
+    stmt = _FIND_BASE_STMT
+
+    # Collect the filter conditions first and apply them in one where() call, so the select is
+    # only rewritten once instead of per filter
+    conditions = [
+        where_clause_int_in(models.Filament.id, ids),
+        where_clause_int_opt(models.Filament.vendor_id, vendor_id),
+        where_clause_str(models.Vendor.name, vendor_name),
+        where_clause_str_opt(models.Filament.name, name),
+        where_clause_str_opt(models.Filament.material, material),
+        where_clause_str_opt(models.Filament.article_number, article_number),
+    ]
+    active = [condition for condition in conditions if condition is not None]
+    if active:
+        stmt = stmt.where(sqlalchemy.and_(*active))
+
+    if sort_by is not None:
+        for fieldstr, order in sort_by.items():
+            if fieldstr not in _SORT_FIELDS:
+                raise ValueError(f"Invalid field name '{fieldstr}', it is not a valid field to sort filaments on.")
+            field = _SORT_FIELDS[fieldstr]
+            if order == SortOrder.ASC:
+                stmt = stmt.order_by(field.asc())
+            elif order == SortOrder.DESC:
+                stmt = stmt.order_by(field.desc())
+
+    # Stable tiebreaker on the indexed PK, so pagination order is deterministic
+    return stmt.order_by(models.Filament.id.asc())
+
+
 async def find(
     *,
     db: AsyncSession,
@@ -96,49 +201,130 @@ async def find(
     sort_by: Optional[dict[str, SortOrder]] = None,
     limit: Optional[int] = None,
     offset: int = 0,
+    after_id: Optional[int] = None,
 ) -> tuple[list[models.Filament], int]:
     """Find a list of filament objects by search criteria.
 
     Sort by a field by passing a dict with the field name as key and the sort order as value.
     The field name can contain nested fields, e.g. vendor.name.
 
+    Pass after_id to paginate by keyset instead of offset: only filaments with a greater ID are
+    returned, which the database resolves with an index seek instead of skipping offset rows.
+    Only meaningful with the default ID sort order; offset is ignored when it is set.
+
     Returns a tuple containing the list of items and the total count of matching items.
     """
-    stmt = (
-        select(models.Filament)
-        .options(contains_eager(models.Filament.vendor))
-        .join(models.Filament.vendor, isouter=True)
+    stmt = _find_stmt(
+        ids=ids,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        name=name,
+        material=material,
+        article_number=article_number,
+        sort_by=sort_by,
     )
 
-    stmt = add_where_clause_int_in(stmt, models.Filament.id, ids)
-    stmt = add_where_clause_int_opt(stmt, models.Filament.vendor_id, vendor_id)
-    stmt = add_where_clause_str(stmt, models.Vendor.name, vendor_name)
-    stmt = add_where_clause_str_opt(stmt, models.Filament.name, name)
-    stmt = add_where_clause_str_opt(stmt, models.Filament.material, material)
-    stmt = add_where_clause_str_opt(stmt, models.Filament.article_number, article_number)
-
-    total_count = None
+    if after_id is not None:
+        stmt = stmt.where(models.Filament.id > after_id)
+        offset = 0
 
     if limit is not None:
-        total_count_stmt = stmt.with_only_columns(func.count(), maintain_column_froms=True)
-        total_count = (await db.execute(total_count_stmt)).scalar()
+        # Fetch the total count in the same round trip as the page itself.
+        # The window function is evaluated before LIMIT/OFFSET are applied.
+        stmt = stmt.add_columns(func.count().over()).offset(offset).limit(limit)
+
+        result = []
+        total_count = 0
+        for row in (await db.execute(stmt)).unique():
+            result.append(row[0])
+            total_count = row[1]
+
+        if not result and offset > 0:
+            # The requested page is past the end, so no row carried the count
+            total_count = await count(
+                db=db,
+                ids=ids,
+                vendor_name=vendor_name,
+                vendor_id=vendor_id,
+                name=name,
+                material=material,
+                article_number=article_number,
+            )
+
+        return result, total_count
 
-        stmt = stmt.offset(offset).limit(limit)
+    rows = await db.execute(stmt)
+    result = rows.unique().scalars().all()
+    return result, len(result)
 
-    if sort_by is not None:
-        for fieldstr, order in sort_by.items():
-            field = parse_nested_field(models.Filament, fieldstr)
-            if order == SortOrder.ASC:
-                stmt = stmt.order_by(field.asc())
-            elif order == SortOrder.DESC:
-                stmt = stmt.order_by(field.desc())
 
-    rows = await db.execute(stmt)
-    result = list(rows.unique().scalars().all())
-    if total_count is None:
-        total_count = len(result)
+async def count(
+    *,
+    db: AsyncSession,
+    ids: Optional[list[int]] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    name: Optional[str] = None,
+    material: Optional[str] = None,
+    article_number: Optional[str] = None,
+) -> int:
+    """Count the number of filament objects matching the search criteria."""
+    stmt = _find_stmt(
+        ids=ids,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        name=name,
+        material=material,
+        article_number=article_number,
+    )
+    # Strip the ORDER BY tiebreaker; ordering an aggregate by a non-aggregated column is
+    # rejected by most backends
+    stmt = stmt.order_by(None).with_only_columns(func.count(), maintain_column_froms=True)
+    return (await db.execute(stmt)).scalar() or 0
 
-    return result, total_count
+
+async def find_iter(
+    *,
+    db: AsyncSession,
+    ids: Optional[list[int]] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    name: Optional[str] = None,
+    material: Optional[str] = None,
+    article_number: Optional[str] = None,
+    sort_by: Optional[dict[str, SortOrder]] = None,
+) -> AsyncIterator[models.Filament]:
+    """Stream filament objects matching the search criteria without materializing the full result list.
+
+    The statement is built and executed before the iterator is returned, so invalid search
+    criteria raise here rather than mid-iteration.
+    The extra-field collections are loaded with selectin instead of joined loading here, since
+    joined collection loading cannot be combined with server-side streaming.
+    """
+    stmt = _find_stmt(
+        ids=ids,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        name=name,
+        material=material,
+        article_number=article_number,
+        sort_by=sort_by,
+    ).options(
+        selectinload(models.Filament.extra),
+        contains_eager(models.Filament.vendor).selectinload(models.Vendor.extra),
+    )
+
+    if db.get_bind().dialect.name in {"mysql", "mariadb"}:
+        # The selectinload batch queries need a second cursor while the main result is still
+        # open, which the MySQL drivers do not support; buffer the full result there instead
+        rows = await db.execute(stmt)
+        return iter_async(rows.unique().scalars().all())
+
+    return await db.stream_scalars(stmt.execution_options(yield_per=100))
+
+
+# Fields that need the ORM update path: relationship lookups or collections
+_UPDATE_SPECIAL_FIELDS = frozenset({"vendor_id", "extra"})
 
 
 async def update(
@@ -148,6 +334,25 @@ async def update(
     data: dict,
 ) -> models.Filament:
     """Update the fields of a filament object."""
+    if not _UPDATE_SPECIAL_FIELDS.intersection(data):
+        # Scalar-only update: issue a single UPDATE instead of walking the attributes through
+        # the unit of work, then read the row back through get_by_id.
+        values = dict(data)
+        if "color_hex" in values:
+            values["color_l"], values["color_a"], values["color_b"] = _lab_components(values["color_hex"])
+        if values:  # An empty patch is a no-op; UPDATE with no values is a syntax error
+            await db.execute(
+                sqlalchemy.update(models.Filament).where(models.Filament.id == filament_id).values(**values),
+                execution_options={"synchronize_session": False},
+            )
+        result = await db.execute(_GET_BY_ID_REFRESH_STMT, {"filament_id": filament_id})
+        filament = result.unique().scalar_one_or_none()
+        if filament is None:
+            raise ItemNotFoundError(f"No filament with ID {filament_id} found.")
+        await db.commit()
+        await filament_changed(filament, EventType.UPDATED)
+        return filament
+
     filament = await get_by_id(db, filament_id)
     for k, v in data.items():
         if k == "vendor_id":
@@ -157,6 +362,9 @@ async def update(
                 filament.vendor = await vendor.get_by_id(db, v)
         elif k == "extra":
             filament.extra = [models.FilamentField(key=k, value=v) for k, v in v.items()]
+        elif k == "color_hex":
+            filament.color_hex = v
+            filament.color_l, filament.color_a, filament.color_b = _lab_components(v)
         else:
             setattr(filament, k, v)
     await db.commit()
@@ -186,14 +394,20 @@ async def clear_extra_field(db: AsyncSession, key: str) -> None:
 logger = logging.getLogger(__name__)
 
 
+# Parameterless statements for the distinct-value lookups, built once at module import
+_STMT_MATERIALS = select(models.Filament.material).where(models.Filament.material.is_not(None)).distinct()
+_STMT_ARTICLE_NUMBERS = (
+    select(models.Filament.article_number).where(models.Filament.article_number.is_not(None)).distinct()
+)
+
+
 async def find_materials(
     *,
     db: AsyncSession,
 ) -> list[str]:
     """Find a list of filament materials by searching for distinct values in the filament table."""
-    stmt = select(models.Filament.material).distinct()
-    rows = await db.execute(stmt)
-    return [row[0] for row in rows.all() if row[0] is not None]
+    rows = await db.execute(_STMT_MATERIALS)
+    return rows.scalars().all()
 
 
 async def find_article_numbers(
@@ -201,9 +415,8 @@ async def find_article_numbers(
     db: AsyncSession,
 ) -> list[str]:
     """Find a list of filament article numbers by searching for distinct values in the filament table."""
-    stmt = select(models.Filament.article_number).distinct()
-    rows = await db.execute(stmt)
-    return [row[0] for row in rows.all() if row[0] is not None]
+    rows = await db.execute(_STMT_ARTICLE_NUMBERS)
+    return rows.scalars().all()
 
 
 async def find_by_color(
@@ -211,36 +424,66 @@ async def find_by_color(
     db: AsyncSession,
     color_query_hex: str,
     similarity_threshold: float = 25,
-) -> list[models.Filament]:
-    """Find a list of filament objects by similarity to a color.
+) -> list[int]:
+    """Find IDs of filaments with a color similar to the query color.
 
-    This performs a server-side search, where all filaments are loaded into memory, making it not so efficient.
+    The CIE94 color difference against the precomputed Lab columns is evaluated in the database,
+    so only the matching IDs are transferred.
     The similarity threshold is a value between 0 and 100, where 0 means the colors must be identical and 100 means
     pretty much all colors are considered similar.
     """
-    filaments, _ = await find(db=db)
+    l_query, a_query, b_query = _hex_to_lab(color_query_hex)
+
+    # CIE94 weighting factors depend only on the query (reference) color
+    c1 = math.sqrt(a_query * a_query + b_query * b_query)
+    sc = 1.0 + 0.045 * c1
+    sh = 1.0 + 0.015 * c1
+
+    delta_l = models.Filament.color_l - l_query
+    delta_a = models.Filament.color_a - a_query
+    delta_b = models.Filament.color_b - b_query
+    c2 = func.sqrt(
+        models.Filament.color_a * models.Filament.color_a + models.Filament.color_b * models.Filament.color_b,
+    )
+    delta_c = c1 - c2
+    delta_h2 = delta_a * delta_a + delta_b * delta_b - delta_c * delta_c
+    delta_c_sc = delta_c / sc
+    distance2 = (
+        delta_l * delta_l
+        + delta_c_sc * delta_c_sc
+        + sqlalchemy.case((delta_h2 > 0, delta_h2), else_=0.0) / (sh * sh)
+    )
 
-    color_query_lab = rgb_to_lab(hex_to_rgb(color_query_hex))
+    stmt = select(models.Filament.id).where(
+        models.Filament.color_l.is_not(None),
+        distance2 <= similarity_threshold * similarity_threshold,
+    )
 
-    found_filaments: list[models.Filament] = []
-    for filament in filaments:
-        if filament.color_hex is None:
-            continue
-        color_lab = rgb_to_lab(hex_to_rgb(filament.color_hex))
-        if delta_e(color_query_lab, color_lab) <= similarity_threshold:
-            found_filaments.append(filament)
+    if db.get_bind().dialect.name == "postgresql":
+        # Prefilter with a Lab bounding box that the GiST cube index can answer, so the exact
+        # CIE94 predicate only runs on the nearby candidates. CIE94 <= t bounds |dL| by t and
+        # sqrt(da^2 + db^2) by t * sqrt(sc^2 + sh^2), so a box with that half-width contains
+        # every possible match.
+        r = similarity_threshold * math.sqrt(sc * sc + sh * sh)
+        box = func.cube(
+            pg_array([l_query - similarity_threshold, a_query - r, b_query - r]),
+            pg_array([l_query + similarity_threshold, a_query + r, b_query + r]),
+        )
+        point = func.cube(pg_array([models.Filament.color_l, models.Filament.color_a, models.Filament.color_b]))
+        stmt = stmt.where(point.op("<@")(box))
 
-    return found_filaments
+    rows = await db.execute(stmt)
+    return rows.scalars().all()
 
 
 async def filament_changed(filament: models.Filament, typ: EventType) -> None:
     """Notify websocket clients that a filament has changed."""
-    await websocket_manager.send(
-        ("filament", str(filament.id)),
+    websocket_manager.queue_event(
+        item_pool("filament", filament.id),
         FilamentEvent(
             type=typ,
             resource="filament",
-            date=datetime.utcnow(),
+            date=utc_now(),
             payload=Filament.from_db(filament),
         ),
     )
@@ -47,6 +47,9 @@ class Filament(Base):
     settings_extruder_temp: Mapped[Optional[int]] = mapped_column(comment="Overridden extruder temperature.")
     settings_bed_temp: Mapped[Optional[int]] = mapped_column(comment="Overridden bed temperature.")
     color_hex: Mapped[Optional[str]] = mapped_column(String(8))
+    color_l: Mapped[Optional[float]] = mapped_column(comment="CIELAB L component of color_hex.")
+    color_a: Mapped[Optional[float]] = mapped_column(comment="CIELAB a component of color_hex.")
+    color_b: Mapped[Optional[float]] = mapped_column(comment="CIELAB b component of color_hex.")
     extra: Mapped[list["FilamentField"]] = relationship(
         back_populates="filament",
         cascade="save-update, merge, delete, delete-orphan",
@@ -1,6 +1,5 @@
 """Helper functions for interacting with vendor database objects."""
 
-from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import select
@@ -8,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from spoolman.api.v1.models import EventType, SettingEvent, SettingKV
 from spoolman.database import models
+from spoolman.database.utils import utc_now
 from spoolman.exceptions import ItemNotFoundError
 from spoolman.settings import SettingDefinition
 from spoolman.ws import websocket_manager
@@ -28,7 +28,7 @@ async def update(
     setting = models.Setting(
         key=definition.key,
         value=value,
-        last_updated=datetime.utcnow().replace(microsecond=0),
+        last_updated=utc_now().replace(microsecond=0),
     )
     await db.merge(setting)
     await setting_changed(definition, value, EventType.UPDATED)
@@ -46,7 +46,7 @@ async def get_all(db: AsyncSession) -> list[models.Setting]:
     """Get all set settings in the database."""
     stmt = select(models.Setting)
     rows = await db.execute(stmt)
-    return list(rows.scalars().all())
+    return rows.scalars().all()
 
 
 async def delete(db: AsyncSession, definition: SettingDefinition) -> None:
@@ -58,12 +58,12 @@ async def delete(db: AsyncSession, definition: SettingDefinition) -> None:
 
 async def setting_changed(definition: SettingDefinition, set_value: Optional[str], typ: EventType) -> None:
     """Notify websocket clients that a setting has changed."""
-    await websocket_manager.send(
+    websocket_manager.queue_event(
         ("setting", str(definition.key)),
         SettingEvent(
             type=typ,
             resource="setting",
-            date=datetime.utcnow(),
+            date=utc_now(),
             payload=SettingKV.from_db(definition, set_value),
         ),
     )
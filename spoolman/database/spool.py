@@ -1,33 +1,43 @@
 """Helper functions for interacting with spool database objects."""
 
-from collections.abc import Sequence
-from datetime import datetime, timezone
+import math
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from typing import Optional, Union
 
 import sqlalchemy
 from sqlalchemy import case, func
-from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from spoolman.api.v1.models import EventType, Spool, SpoolEvent
 from spoolman.database import filament, models
 from spoolman.database.utils import (
     SortOrder,
-    add_where_clause_int,
-    add_where_clause_int_opt,
-    add_where_clause_str,
-    add_where_clause_str_opt,
-    parse_nested_field,
+    iter_async,
+    utc_now,
+    where_clause_int,
+    where_clause_int_opt,
+    where_clause_str,
+    where_clause_str_opt,
 )
 from spoolman.exceptions import ItemCreateError, ItemNotFoundError
-from spoolman.math import weight_from_length
-from spoolman.ws import websocket_manager
+from spoolman.ws import item_pool, websocket_manager
 
 
 def utc_timezone_naive(dt: datetime) -> datetime:
-    """Convert a datetime object to UTC and remove timezone info."""
-    return dt.astimezone(tz=timezone.utc).replace(tzinfo=None)
+    """Convert a datetime object to UTC and remove timezone info.
+
+    Naive datetimes are assumed to already be in UTC and returned as-is; astimezone() would
+    otherwise interpret them as local time and shift the value.
+    """
+    tz = dt.tzinfo
+    if tz is None:
+        return dt
+    offset = tz.utcoffset(dt)
+    if offset is None or not offset:
+        return dt.replace(tzinfo=None)
+    return (dt - offset).replace(tzinfo=None)
 
 
 async def create(
@@ -63,7 +73,7 @@ async def create(
 
     spool = models.Spool(
         filament=filament_item,
-        registered=datetime.utcnow().replace(microsecond=0),
+        registered=utc_now().replace(microsecond=0),
         used_weight=used_weight,
         price=price,
         first_used=first_used,
@@ -80,18 +90,117 @@ async def create(
     return spool
 
 
+# Prepared once at module scope so the loader-option tree and the compiled SQL are reused
+# from the statement cache on every call.
+# Load the nested objects as well, with a static option tree instead of joinedload("*"):
+# joined loads for the to-one chain, selectin loads for the extra-field collections.
+_GET_BY_ID_STMT = (
+    sqlalchemy.select(models.Spool)
+    .where(models.Spool.id == sqlalchemy.bindparam("spool_id"))
+    .options(
+        joinedload(models.Spool.filament).joinedload(models.Filament.vendor),
+        selectinload(models.Spool.extra),
+        joinedload(models.Spool.filament).selectinload(models.Filament.extra),
+        joinedload(models.Spool.filament).joinedload(models.Filament.vendor).selectinload(models.Vendor.extra),
+    )
+    # Always read back from the database, so values computed by UPDATE statements are seen
+    .execution_options(populate_existing=True)
+)
+
+
 async def get_by_id(db: AsyncSession, spool_id: int) -> models.Spool:
     """Get a spool object from the database by the unique ID."""
-    spool = await db.get(
-        models.Spool,
-        spool_id,
-        options=[joinedload("*")],  # Load all nested objects as well
-    )
+    result = await db.execute(_GET_BY_ID_STMT, {"spool_id": spool_id})
+    spool = result.unique().scalar_one_or_none()
     if spool is None:
         raise ItemNotFoundError(f"No spool with ID {spool_id} found.")
     return spool
 
 
+# Shared building blocks for the find statements, hoisted so each call starts from the same
+# pre-built (and statement-cache-friendly) structure instead of reconstructing it
+_FIND_BASE_STMT = (
+    sqlalchemy.select(models.Spool)
+    .join(models.Spool.filament, isouter=True)
+    .join(models.Filament.vendor, isouter=True)
+    .options(contains_eager(models.Spool.filament).contains_eager(models.Filament.vendor))
+)
+_NOT_ARCHIVED = sqlalchemy.or_(
+    models.Spool.archived.is_(False),
+    models.Spool.archived.is_(None),
+)
+_REMAINING_WEIGHT = models.Filament.weight - models.Spool.used_weight
+
+# Allowlisted sort fields, precomputed so sorting is a dict lookup instead of a reflective
+# attribute walk per request. Nested filament/vendor fields use the joined tables.
+_SORT_FIELDS: dict[str, sqlalchemy.ColumnElement] = {
+    **{attr.key: getattr(models.Spool, attr.key) for attr in sqlalchemy.inspect(models.Spool).mapper.column_attrs},
+    **{
+        f"filament.{attr.key}": getattr(models.Filament, attr.key)
+        for attr in sqlalchemy.inspect(models.Filament).mapper.column_attrs
+    },
+    **{
+        f"filament.vendor.{attr.key}": getattr(models.Vendor, attr.key)
+        for attr in sqlalchemy.inspect(models.Vendor).mapper.column_attrs
+    },
+}
+
+
+def _find_stmt(
+    *,
+    filament_name: Optional[str] = None,
+    filament_id: Optional[Union[int, Sequence[int]]] = None,
+    filament_material: Optional[str] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    location: Optional[str] = None,
+    lot_nr: Optional[str] = None,
+    allow_archived: bool = False,
+    sort_by: Optional[dict[str, SortOrder]] = None,
+) -> sqlalchemy.Select:
+    """Build a select statement for spool objects matching the search criteria."""
+    stmt = _FIND_BASE_STMT
+
+    # Collect the filter conditions first and apply them in one where() call, so the select is
+    # only rewritten once instead of per filter
+    conditions = [
+        where_clause_int(models.Spool.filament_id, filament_id),
+        where_clause_int_opt(models.Filament.vendor_id, vendor_id),
+        where_clause_str(models.Vendor.name, vendor_name),
+        where_clause_str_opt(models.Filament.name, filament_name),
+        where_clause_str_opt(models.Filament.material, filament_material),
+        where_clause_str_opt(models.Spool.location, location),
+        where_clause_str_opt(models.Spool.lot_nr, lot_nr),
+    ]
+    if not allow_archived:
+        # Since the archived field is nullable, and default is false, we need to check for both false or null
+        conditions.append(_NOT_ARCHIVED)
+    active = [condition for condition in conditions if condition is not None]
+    if active:
+        stmt = stmt.where(sqlalchemy.and_(*active))
+
+    if sort_by is not None:
+        for fieldstr, order in sort_by.items():
+            sorts = []
+            if fieldstr in {"remaining_weight", "remaining_length"}:
+                sorts.append(_REMAINING_WEIGHT)
+            elif fieldstr == "filament.combined_name":
+                sorts.append(models.Vendor.name)
+                sorts.append(models.Filament.name)
+            elif fieldstr in _SORT_FIELDS:
+                sorts.append(_SORT_FIELDS[fieldstr])
+            else:
+                raise ValueError(f"Invalid field name '{fieldstr}', it is not a valid field to sort spools on.")
+
+            if order == SortOrder.ASC:
+                stmt = stmt.order_by(*(f.asc() for f in sorts))
+            elif order == SortOrder.DESC:
+                stmt = stmt.order_by(*(f.desc() for f in sorts))
+
+    # Stable tiebreaker on the indexed PK, so pagination order is deterministic
+    return stmt.order_by(models.Spool.id.asc())
+
+
 async def find(
     *,
     db: AsyncSession,
@@ -106,68 +215,145 @@ async def find(
     sort_by: Optional[dict[str, SortOrder]] = None,
     limit: Optional[int] = None,
     offset: int = 0,
+    after_id: Optional[int] = None,
 ) -> tuple[list[models.Spool], int]:
     """Find a list of spool objects by search criteria.
 
     Sort by a field by passing a dict with the field name as key and the sort order as value.
     The field name can contain nested fields, e.g. filament.name.
 
+    Pass after_id to paginate by keyset instead of offset: only spools with a greater ID are
+    returned, which the database resolves with an index seek instead of skipping offset rows.
+    Only meaningful with the default ID sort order; offset is ignored when it is set.
+
     Returns a tuple containing the list of items and the total count of matching items.
     """
-    stmt = (
-        sqlalchemy.select(models.Spool)
-        .join(models.Spool.filament, isouter=True)
-        .join(models.Filament.vendor, isouter=True)
-        .options(contains_eager(models.Spool.filament).contains_eager(models.Filament.vendor))
+    stmt = _find_stmt(
+        filament_name=filament_name,
+        filament_id=filament_id,
+        filament_material=filament_material,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        location=location,
+        lot_nr=lot_nr,
+        allow_archived=allow_archived,
+        sort_by=sort_by,
     )
 
-    stmt = add_where_clause_int(stmt, models.Spool.filament_id, filament_id)
-    stmt = add_where_clause_int_opt(stmt, models.Filament.vendor_id, vendor_id)
-    stmt = add_where_clause_str(stmt, models.Vendor.name, vendor_name)
-    stmt = add_where_clause_str_opt(stmt, models.Filament.name, filament_name)
-    stmt = add_where_clause_str_opt(stmt, models.Filament.material, filament_material)
-    stmt = add_where_clause_str_opt(stmt, models.Spool.location, location)
-    stmt = add_where_clause_str_opt(stmt, models.Spool.lot_nr, lot_nr)
+    if after_id is not None:
+        stmt = stmt.where(models.Spool.id > after_id)
+        offset = 0
 
-    if not allow_archived:
-        # Since the archived field is nullable, and default is false, we need to check for both false or null
-        stmt = stmt.where(
-            sqlalchemy.or_(
-                models.Spool.archived.is_(False),
-                models.Spool.archived.is_(None),
-            ),
-        )
+    if limit is not None:
+        # Fetch the total count in the same round trip as the page itself.
+        # The window function is evaluated before LIMIT/OFFSET are applied.
+        stmt = stmt.add_columns(func.count().over()).offset(offset).limit(limit)
+
+        result = []
+        total_count = 0
+        for row in (await db.execute(stmt)).unique():
+            result.append(row[0])
+            total_count = row[1]
+
+        if not result and offset > 0:
+            # The requested page is past the end, so no row carried the count
+            total_count = await count(
+                db=db,
+                filament_name=filament_name,
+                filament_id=filament_id,
+                filament_material=filament_material,
+                vendor_name=vendor_name,
+                vendor_id=vendor_id,
+                location=location,
+                lot_nr=lot_nr,
+                allow_archived=allow_archived,
+            )
+
+        return result, total_count
 
-    total_count = None
+    rows = await db.execute(stmt)
+    result = rows.unique().scalars().all()
+    return result, len(result)
 
-    if limit is not None:
-        total_count_stmt = stmt.with_only_columns(func.count(), maintain_column_froms=True)
-        total_count = (await db.execute(total_count_stmt)).scalar()
 
-        stmt = stmt.offset(offset).limit(limit)
+async def count(
+    *,
+    db: AsyncSession,
+    filament_name: Optional[str] = None,
+    filament_id: Optional[Union[int, Sequence[int]]] = None,
+    filament_material: Optional[str] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    location: Optional[str] = None,
+    lot_nr: Optional[str] = None,
+    allow_archived: bool = False,
+) -> int:
+    """Count the number of spool objects matching the search criteria."""
+    stmt = _find_stmt(
+        filament_name=filament_name,
+        filament_id=filament_id,
+        filament_material=filament_material,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        location=location,
+        lot_nr=lot_nr,
+        allow_archived=allow_archived,
+    )
+    # Strip the ORDER BY tiebreaker; ordering an aggregate by a non-aggregated column is
+    # rejected by most backends
+    stmt = stmt.order_by(None).with_only_columns(func.count(), maintain_column_froms=True)
+    return (await db.execute(stmt)).scalar() or 0
 
-    if sort_by is not None:
-        for fieldstr, order in sort_by.items():
-            sorts = []
-            if fieldstr in {"remaining_weight", "remaining_length"}:
-                sorts.append(models.Filament.weight - models.Spool.used_weight)
-            elif fieldstr == "filament.combined_name":
-                sorts.append(models.Vendor.name)
-                sorts.append(models.Filament.name)
-            else:
-                sorts.append(parse_nested_field(models.Spool, fieldstr))
 
-            if order == SortOrder.ASC:
-                stmt = stmt.order_by(*(f.asc() for f in sorts))
-            elif order == SortOrder.DESC:
-                stmt = stmt.order_by(*(f.desc() for f in sorts))
+async def find_iter(
+    *,
+    db: AsyncSession,
+    filament_name: Optional[str] = None,
+    filament_id: Optional[Union[int, Sequence[int]]] = None,
+    filament_material: Optional[str] = None,
+    vendor_name: Optional[str] = None,
+    vendor_id: Optional[Union[int, Sequence[int]]] = None,
+    location: Optional[str] = None,
+    lot_nr: Optional[str] = None,
+    allow_archived: bool = False,
+    sort_by: Optional[dict[str, SortOrder]] = None,
+) -> AsyncIterator[models.Spool]:
+    """Stream spool objects matching the search criteria without materializing the full result list.
 
-    rows = await db.execute(stmt)
-    result = list(rows.unique().scalars().all())
-    if total_count is None:
-        total_count = len(result)
+    The statement is built and executed before the iterator is returned, so invalid search
+    criteria raise here rather than mid-iteration.
+    The extra-field collections are loaded with selectin instead of joined loading here, since
+    joined collection loading cannot be combined with server-side streaming.
+    """
+    stmt = _find_stmt(
+        filament_name=filament_name,
+        filament_id=filament_id,
+        filament_material=filament_material,
+        vendor_name=vendor_name,
+        vendor_id=vendor_id,
+        location=location,
+        lot_nr=lot_nr,
+        allow_archived=allow_archived,
+        sort_by=sort_by,
+    ).options(
+        selectinload(models.Spool.extra),
+        contains_eager(models.Spool.filament).selectinload(models.Filament.extra),
+        contains_eager(models.Spool.filament)
+        .contains_eager(models.Filament.vendor)
+        .selectinload(models.Vendor.extra),
+    )
+
+    if db.get_bind().dialect.name in {"mysql", "mariadb"}:
+        # The selectinload batch queries need a second cursor while the main result is still
+        # open, which the MySQL drivers do not support; buffer the full result there instead
+        rows = await db.execute(stmt)
+        return iter_async(rows.unique().scalars().all())
 
-    return result, total_count
+    return await db.stream_scalars(stmt.execution_options(yield_per=100))
+
+
+# Fields that need the ORM update path: relationship lookups, derived values or collections
+_UPDATE_SPECIAL_FIELDS = frozenset({"filament_id", "remaining_weight", "extra"})
 
 
 async def update(
@@ -177,6 +363,20 @@ async def update(
     data: dict,
 ) -> models.Spool:
     """Update the fields of a spool object."""
+    if not _UPDATE_SPECIAL_FIELDS.intersection(data):
+        # Scalar-only update: issue a single UPDATE instead of walking the attributes through
+        # the unit of work, then read the row back through get_by_id (which refreshes).
+        values = {k: utc_timezone_naive(v) if isinstance(v, datetime) else v for k, v in data.items()}
+        if values:  # An empty patch is a no-op; UPDATE with no values is a syntax error
+            await db.execute(
+                sqlalchemy.update(models.Spool).where(models.Spool.id == spool_id).values(**values),
+                execution_options={"synchronize_session": False},
+            )
+        spool = await get_by_id(db, spool_id)
+        await db.commit()
+        await spool_changed(spool, EventType.UPDATED)
+        return spool
+
     spool = await get_by_id(db, spool_id)
     for k, v in data.items():
         if k == "filament_id":
@@ -210,15 +410,13 @@ async def clear_extra_field(db: AsyncSession, key: str) -> None:
     )
 
 
-async def use_weight_safe(db: AsyncSession, spool_id: int, weight: float) -> None:
-    """Consume filament from a spool by weight in a way that is safe against race conditions.
+def _consume_stmt(spool_id: int, weight: Union[float, sqlalchemy.ColumnElement[float]]) -> sqlalchemy.Update:
+    """Build an UPDATE that consumes filament weight and maintains the usage timestamps atomically.
 
-    Args:
-        db (AsyncSession): Database session
-        spool_id (int): Spool ID
-        weight (float): Filament weight to consume, in grams
+    The weight can be a plain number or a SQL expression evaluated by the database.
     """
-    await db.execute(
+    now = utc_now().replace(microsecond=0)
+    return (
         sqlalchemy.update(models.Spool)
         .where(models.Spool.id == spool_id)
         .values(
@@ -226,10 +424,25 @@ async def use_weight_safe(db: AsyncSession, spool_id: int, weight: float) -> Non
                 (models.Spool.used_weight + weight >= 0.0, models.Spool.used_weight + weight),  # noqa: PLR2004
                 else_=0.0,  # Set used_weight to 0 if the result would be negative
             ),
-        ),
+            first_used=func.coalesce(models.Spool.first_used, now),
+            last_used=now,
+        )
     )
 
 
+async def use_weight_safe(db: AsyncSession, spool_id: int, weight: float) -> None:
+    """Consume filament from a spool by weight in a way that is safe against race conditions.
+
+    Also updates the first_used and last_used attributes in the same statement.
+
+    Args:
+        db (AsyncSession): Database session
+        spool_id (int): Spool ID
+        weight (float): Filament weight to consume, in grams
+    """
+    await db.execute(_consume_stmt(spool_id, weight), execution_options={"synchronize_session": False})
+
+
 async def use_weight(db: AsyncSession, spool_id: int, weight: float) -> models.Spool:
     """Consume filament from a spool by weight.
 
@@ -247,11 +460,6 @@ async def use_weight(db: AsyncSession, spool_id: int, weight: float) -> models.S
     await use_weight_safe(db, spool_id, weight)
 
     spool = await get_by_id(db, spool_id)
-
-    if spool.first_used is None:
-        spool.first_used = datetime.utcnow().replace(microsecond=0)
-    spool.last_used = datetime.utcnow().replace(microsecond=0)
-
     await db.commit()
     await spool_changed(spool, EventType.UPDATED)
     return spool
@@ -271,45 +479,34 @@ async def use_length(db: AsyncSession, spool_id: int, length: float) -> models.S
     Returns:
         models.Spool: Updated spool object
     """
-    # Get filament diameter and density
-    result = await db.execute(
-        sqlalchemy.select(models.Filament.diameter, models.Filament.density)
-        .join(models.Spool, models.Spool.filament_id == models.Filament.id)
-        .where(models.Spool.id == spool_id),
-    )
-    try:
-        filament_info = result.one()
-    except NoResultFound as exc:
-        raise ItemNotFoundError("Filament not found for spool.") from exc
-
-    # Calculate and use weight
-    weight = weight_from_length(
-        length=length,
-        diameter=filament_info[0],
-        density=filament_info[1],
+    # Convert the length to a weight server-side using the filament diameter and density,
+    # so no extra lookup round trip is needed
+    volume_cm3 = length * math.pi * (models.Filament.diameter / 2) * (models.Filament.diameter / 2) / 1000
+    weight = (
+        sqlalchemy.select(models.Filament.density * volume_cm3)
+        .where(models.Filament.id == models.Spool.filament_id)
+        .scalar_subquery()
     )
-    await use_weight_safe(db, spool_id, weight)
+    await db.execute(_consume_stmt(spool_id, weight), execution_options={"synchronize_session": False})
 
-    # Get spool with new weight and update first_used and last_used
     spool = await get_by_id(db, spool_id)
-
-    if spool.first_used is None:
-        spool.first_used = datetime.utcnow().replace(microsecond=0)
-    spool.last_used = datetime.utcnow().replace(microsecond=0)
-
     await db.commit()
     await spool_changed(spool, EventType.UPDATED)
     return spool
 
 
+# Parameterless statements for the distinct-value lookups, built once at module import
+_STMT_LOCATIONS = sqlalchemy.select(models.Spool.location).where(models.Spool.location.is_not(None)).distinct()
+_STMT_LOT_NUMBERS = sqlalchemy.select(models.Spool.lot_nr).where(models.Spool.lot_nr.is_not(None)).distinct()
+
+
 async def find_locations(
     *,
     db: AsyncSession,
 ) -> list[str]:
     """Find a list of spool locations by searching for distinct values in the spool table."""
-    stmt = sqlalchemy.select(models.Spool.location).distinct()
-    rows = await db.execute(stmt)
-    return [row[0] for row in rows.all() if row[0] is not None]
+    rows = await db.execute(_STMT_LOCATIONS)
+    return rows.scalars().all()
 
 
 async def find_lot_numbers(
@@ -317,19 +514,18 @@ async def find_lot_numbers(
     db: AsyncSession,
 ) -> list[str]:
     """Find a list of spool lot numbers by searching for distinct values in the spool table."""
-    stmt = sqlalchemy.select(models.Spool.lot_nr).distinct()
-    rows = await db.execute(stmt)
-    return [row[0] for row in rows.all() if row[0] is not None]
+    rows = await db.execute(_STMT_LOT_NUMBERS)
+    return rows.scalars().all()
 
 
 async def spool_changed(spool: models.Spool, typ: EventType) -> None:
     """Notify websocket clients that a spool has changed."""
-    await websocket_manager.send(
-        ("spool", str(spool.id)),
+    websocket_manager.queue_event(
+        item_pool("spool", spool.id),
         SpoolEvent(
             type=typ,
             resource="spool",
-            date=datetime.utcnow(),
+            date=utc_now(),
             payload=Spool.from_db(spool),
         ),
     )
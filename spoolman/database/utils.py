@@ -1,21 +1,37 @@
 """Utility functions for the database module."""
 
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Optional, TypeVar, Union
 
 import sqlalchemy
-from sqlalchemy import Select
 from sqlalchemy.orm import attributes
 
 from spoolman.database import models
 
+T = TypeVar("T")
+
 
 class SortOrder(Enum):
     ASC = 1
     DESC = 2
 
 
+def utc_now() -> datetime:
+    """Get the current time in UTC as a timezone-naive datetime.
+
+    Replacement for the deprecated datetime.utcnow().
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def iter_async(items: Iterable[T]) -> AsyncIterator[T]:
+    """Wrap an already-materialized iterable in an async iterator."""
+    for item in items:
+        yield item
+
+
 def parse_nested_field(base_obj: type[models.Base], field: str) -> attributes.InstrumentedAttribute[Any]:
     """Parse a nested field string into a sqlalchemy field object."""
     fields = field.split(".")
@@ -38,84 +54,77 @@ def parse_nested_field(base_obj: type[models.Base], field: str) -> attributes.In
     return getattr(base_obj, fields[0])
 
 
-def add_where_clause_str_opt(
-    stmt: Select,
+def where_clause_str_opt(
     field: attributes.InstrumentedAttribute[Optional[str]],
     value: Optional[str],
-) -> Select:
-    """Add a where clause to a select statement for an optional string field."""
-    if value is not None:
-        conditions = []
-        for value_part in value.split(","):
-            if len(value_part) == 0:
-                conditions.append(field.is_(None))
-                conditions.append(field == "")
-            else:
-                conditions.append(field.ilike(f"%{value_part}%"))
-
-        stmt = stmt.where(sqlalchemy.or_(*conditions))
-    return stmt
-
-
-def add_where_clause_str(
-    stmt: Select,
+) -> Optional[sqlalchemy.ColumnElement[bool]]:
+    """Build a filter condition for an optional string field, or None if no value is given."""
+    if value is None:
+        return None
+    conditions = []
+    for value_part in value.split(","):
+        if len(value_part) == 0:
+            conditions.append(field.is_(None))
+            conditions.append(field == "")
+        else:
+            conditions.append(field.ilike(f"%{value_part}%"))
+    return sqlalchemy.or_(*conditions)
+
+
+def where_clause_str(
     field: attributes.InstrumentedAttribute[str],
     value: Optional[str],
-) -> Select:
-    """Add a where clause to a select statement for a string field."""
-    if value is not None:
-        conditions = []
-        for value_part in value.split(","):
-            if len(value_part) == 0:
-                conditions.append(field == "")
-            else:
-                conditions.append(field.ilike(f"%{value_part}%"))
-
-        stmt = stmt.where(sqlalchemy.or_(*conditions))
-    return stmt
-
-
-def add_where_clause_int(
-    stmt: Select,
+) -> Optional[sqlalchemy.ColumnElement[bool]]:
+    """Build a filter condition for a string field, or None if no value is given."""
+    if value is None:
+        return None
+    conditions = []
+    for value_part in value.split(","):
+        if len(value_part) == 0:
+            conditions.append(field == "")
+        else:
+            conditions.append(field.ilike(f"%{value_part}%"))
+    return sqlalchemy.or_(*conditions)
+
+
+def where_clause_int(
     field: attributes.InstrumentedAttribute[int],
     value: Optional[Union[int, Sequence[int]]],
-) -> Select:
-    """Add a where clause to a select statement for a field."""
-    if value is not None:
-        if isinstance(value, int):
-            value = [value]
-        stmt = stmt.where(field.in_(value))
-    return stmt
+) -> Optional[sqlalchemy.ColumnElement[bool]]:
+    """Build a filter condition for an integer field, or None if no value is given."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        value = [value]
+    return field.in_(value)
 
 
-def add_where_clause_int_opt(
-    stmt: Select,
+def where_clause_int_opt(
     field: attributes.InstrumentedAttribute[Optional[int]],
     value: Optional[Union[int, Sequence[int]]],
-) -> Select:
-    """Add a where clause to a select statement for a field."""
-    if value is not None:
-        if isinstance(value, int):
-            value = [value]
-        statements = []
-        for value_part in value:
-            if value_part == -1:
-                statements.append(field.is_(None))
-            else:
-                statements.append(field == value_part)
-        stmt = stmt.where(sqlalchemy.or_(*statements))
-    return stmt
-
-
-T = TypeVar("T")
-
-
-def add_where_clause_int_in(
-    stmt: Select,
+) -> Optional[sqlalchemy.ColumnElement[bool]]:
+    """Build a filter condition for an optional integer field, or None if no value is given.
+
+    The value -1 matches rows where the field is null.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        value = [value]
+    statements = []
+    for value_part in value:
+        if value_part == -1:
+            statements.append(field.is_(None))
+        else:
+            statements.append(field == value_part)
+    return sqlalchemy.or_(*statements)
+
+
+def where_clause_int_in(
     field: attributes.InstrumentedAttribute[T],
     value: Optional[Sequence[T]],
-) -> Select:
-    """Add a where clause to a select statement for a field."""
+) -> Optional[sqlalchemy.ColumnElement[bool]]:
+    """Build a filter condition matching a set of values, or None if no values are given."""
     if value is not None and len(value) > 0:
-        stmt = stmt.where(field.in_(value))
-    return stmt
+        return field.in_(value)
+    return None
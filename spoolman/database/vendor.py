@@ -1,6 +1,5 @@
 """Helper functions for interacting with vendor database objects."""
 
-from datetime import datetime
 from typing import Optional
 
 import sqlalchemy
@@ -9,9 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from spoolman.api.v1.models import EventType, Vendor, VendorEvent
 from spoolman.database import models
-from spoolman.database.utils import SortOrder, add_where_clause_str
+from spoolman.database.utils import SortOrder, utc_now, where_clause_str
 from spoolman.exceptions import ItemNotFoundError
-from spoolman.ws import websocket_manager
+from spoolman.ws import item_pool, websocket_manager
 
 
 async def create(
@@ -24,7 +23,7 @@ async def create(
     """Add a new vendor to the database."""
     vendor = models.Vendor(
         name=name,
-        registered=datetime.utcnow().replace(microsecond=0),
+        registered=utc_now().replace(microsecond=0),
         comment=comment,
         extra=[models.VendorField(key=k, value=v) for k, v in (extra or {}).items()],
     )
@@ -34,14 +33,26 @@ async def create(
     return vendor
 
 
+# Prepared once at module scope so the compiled SQL is reused from the statement cache.
+_GET_BY_ID_STMT = select(models.Vendor).where(models.Vendor.id == sqlalchemy.bindparam("vendor_id"))
+
+
 async def get_by_id(db: AsyncSession, vendor_id: int) -> models.Vendor:
     """Get a vendor object from the database by the unique ID."""
-    vendor = await db.get(models.Vendor, vendor_id)
+    result = await db.execute(_GET_BY_ID_STMT, {"vendor_id": vendor_id})
+    vendor = result.unique().scalar_one_or_none()
     if vendor is None:
         raise ItemNotFoundError(f"No vendor with ID {vendor_id} found.")
     return vendor
 
 
+# Allowlisted sort fields, precomputed so sorting is a dict lookup instead of arbitrary
+# attribute traversal per request
+_SORT_FIELDS: dict[str, sqlalchemy.ColumnElement] = {
+    attr.key: getattr(models.Vendor, attr.key) for attr in sqlalchemy.inspect(models.Vendor).mapper.column_attrs
+}
+
+
 async def find(
     *,
     db: AsyncSession,
@@ -56,30 +67,45 @@ async def find(
     """
     stmt = select(models.Vendor)
 
-    stmt = add_where_clause_str(stmt, models.Vendor.name, name)
-
-    total_count = None
-
-    if limit is not None:
-        total_count_stmt = stmt.with_only_columns(func.count(), maintain_column_froms=True)
-        total_count = (await db.execute(total_count_stmt)).scalar()
-
-        stmt = stmt.offset(offset).limit(limit)
+    name_condition = where_clause_str(models.Vendor.name, name)
+    if name_condition is not None:
+        stmt = stmt.where(name_condition)
 
     if sort_by is not None:
         for fieldstr, order in sort_by.items():
-            field = getattr(models.Vendor, fieldstr)
+            if fieldstr not in _SORT_FIELDS:
+                raise ValueError(f"Invalid field name '{fieldstr}', it is not a valid field to sort vendors on.")
+            field = _SORT_FIELDS[fieldstr]
             if order == SortOrder.ASC:
                 stmt = stmt.order_by(field.asc())
             elif order == SortOrder.DESC:
                 stmt = stmt.order_by(field.desc())
 
-    rows = await db.execute(stmt)
-    result = list(rows.unique().scalars().all())
-    if total_count is None:
-        total_count = len(result)
+    # Stable tiebreaker on the indexed PK, so pagination order is deterministic
+    stmt = stmt.order_by(models.Vendor.id.asc())
+
+    if limit is not None:
+        # Fetch the total count in the same round trip as the page itself.
+        # The window function is evaluated before LIMIT/OFFSET are applied.
+        count_stmt = stmt.add_columns(func.count().over()).offset(offset).limit(limit)
+
+        result = []
+        total_count = 0
+        for row in (await db.execute(count_stmt)).unique():
+            result.append(row[0])
+            total_count = row[1]
 
-    return result, total_count
+        if not result and offset > 0:
+            # The requested page is past the end, so no row carried the count
+            total_count = (
+                await db.execute(stmt.order_by(None).with_only_columns(func.count(), maintain_column_froms=True))
+            ).scalar() or 0
+
+        return result, total_count
+
+    rows = await db.execute(stmt)
+    result = rows.unique().scalars().all()
+    return result, len(result)
 
 
 async def update(
@@ -116,12 +142,12 @@ async def clear_extra_field(db: AsyncSession, key: str) -> None:
 
 async def vendor_changed(vendor: models.Vendor, typ: EventType) -> None:
     """Notify websocket clients that a vendor has changed."""
-    await websocket_manager.send(
-        ("vendor", str(vendor.id)),
+    websocket_manager.queue_event(
+        item_pool("vendor", vendor.id),
         VendorEvent(
             type=typ,
             resource="vendor",
-            date=datetime.utcnow(),
+            date=utc_now(),
             payload=Vendor.from_db(vendor),
         ),
     )
@@ -1,13 +1,36 @@
 """Websocket functionality."""
 
+import asyncio
 import logging
+import sys
+from functools import lru_cache
+from typing import Optional
 
+import orjson
 from fastapi import WebSocket
 
-from spoolman.api.v1.models import Event
+from spoolman.api.v1.models import Event, to_json_dict
+from spoolman.api.v1.responses import ORJSON_OPTIONS
 
 logger = logging.getLogger(__name__)
 
+# How long to wait after an event arrives for more events to coalesce with it.
+EVENT_COALESCE_WINDOW_SECONDS = 0.02
+
+
+def _serialize_event(evt: Event) -> str:
+    """Serialize an event to JSON text with orjson, matching the Pydantic .json() output."""
+    return orjson.dumps(to_json_dict(evt, exclude_none=False), option=ORJSON_OPTIONS).decode()
+
+
+@lru_cache(maxsize=4096)
+def item_pool(resource: str, item_id: int) -> tuple[str, str]:
+    """Build the subscription pool tuple for a specific item.
+
+    Cached and interned since the same tuple is built for connect, disconnect and every sent event.
+    """
+    return (resource, sys.intern(str(item_id)))
+
 
 class SubscriptionTree:
     """Subscription tree.
@@ -42,15 +65,15 @@ class SubscriptionTree:
         elif path[0] in self.children:
             self.children[path[0]].remove(path[1:], websocket)
 
-    async def send(self, path: tuple[str, ...], evt: Event) -> None:
-        """Send a message to all websockets in this branch of the tree."""
+    async def send(self, path: tuple[str, ...], text: str) -> None:
+        """Send a pre-serialized message to all websockets in this branch of the tree."""
         # Broadcast to all subscribers on this level
         for websocket in self.subscribers:
-            await websocket.send_text(evt.json())
+            await websocket.send_text(text)
 
         # Send the message further down the tree
         if len(path) > 0 and path[0] in self.children:
-            await self.children[path[0]].send(path[1:], evt)
+            await self.children[path[0]].send(path[1:], text)
 
 
 class WebsocketManager:
@@ -59,6 +82,8 @@ class WebsocketManager:
     def __init__(self) -> None:
         """Initialize."""
         self.tree = SubscriptionTree()
+        self._queue: Optional[asyncio.Queue[tuple[tuple[str, ...], Event]]] = None
+        self._drain_task: Optional[asyncio.Task[None]] = None
 
     def connect(self, pool: tuple[str, ...], websocket: WebSocket) -> None:
         """Connect a websocket."""
@@ -80,7 +105,45 @@ class WebsocketManager:
 
     async def send(self, pool: tuple[str, ...], evt: Event) -> None:
         """Send a message to all websockets in a pool."""
-        await self.tree.send(pool, evt)
+        await self.tree.send(pool, _serialize_event(evt))
+
+    def queue_event(self, pool: tuple[str, ...], evt: Event) -> None:
+        """Queue an event for delivery to all websockets in a pool.
+
+        Events queued for the same pool within a short window are coalesced so that only the
+        latest one is sent, which keeps burst writes from fanning out one message per change.
+        """
+        if self._drain_task is None or self._drain_task.done():
+            self._queue = asyncio.Queue()
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+        if self._queue is not None:
+            self._queue.put_nowait((pool, evt))
+
+    async def _drain(self) -> None:
+        """Deliver queued events, coalescing bursts per pool."""
+        if self._queue is None:
+            return
+        while True:
+            batch: dict[tuple[str, ...], Event] = {}
+            pool, evt = await self._queue.get()
+            batch[pool] = evt
+
+            # Let events arriving right after the first one fold into the same batch.
+            await asyncio.sleep(EVENT_COALESCE_WINDOW_SECONDS)
+            while not self._queue.empty():
+                pool, evt = self._queue.get_nowait()
+                batch[pool] = evt
+
+            for pool, evt in batch.items():
+                await self._send_batched(pool, evt)
+
+    async def _send_batched(self, pool: tuple[str, ...], evt: Event) -> None:
+        """Send one coalesced event, logging failures so the other pools still get theirs."""
+        try:
+            # Serialize once per event; the tree fans the same text out to every subscriber
+            await self.tree.send(pool, _serialize_event(evt))
+        except Exception:
+            logger.exception("Failed to send websocket message on pool %s.", ",".join(pool))
 
 
 websocket_manager = WebsocketManager()
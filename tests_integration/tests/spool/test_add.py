@@ -194,4 +194,4 @@ def test_add_spool_both_used_and_remaining_weight(random_filament: dict[str, Any
             "used_weight": 250,
         },
     )
-    assert result.status_code == 400  # Cannot set both used and remaining weight
+    assert result.status_code == 422  # Cannot set both used and remaining weight
@@ -95,7 +95,7 @@ def test_update_spool_both_used_and_remaining_weight(random_filament: dict[str,
             "used_weight": 250,
         },
     )
-    assert result.status_code == 400  # Cannot update both used and remaining weight
+    assert result.status_code == 422  # Cannot update both used and remaining weight
 
     # Clean up
     httpx.delete(f"{URL}/api/v1/spool/{spool['id']}").raise_for_status()